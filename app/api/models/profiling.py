@@ -0,0 +1,39 @@
+"""Pydantic request/response schemas for the admin profiling endpoints."""
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field, model_validator
+
+
+class ProfilingStartRequest(BaseModel):
+    """Arms profiling for the next N prediction requests or T seconds."""
+    mode: Literal["sampling", "deterministic"] = Field(
+        "sampling", description="Stack sampling or cProfile-based profiling")
+    requests: Optional[int] = Field(None, gt=0, description="Number of prediction requests to profile")
+    seconds: Optional[float] = Field(None, gt=0, description="Profiling window in seconds")
+    interval_ms: float = Field(5.0, gt=0, description="Stack sampling interval in milliseconds")
+
+    @model_validator(mode="after")
+    def _require_limit(self) -> "ProfilingStartRequest":
+        """Require at least one of `requests` or `seconds`."""
+        if self.requests is None and self.seconds is None:
+            raise ValueError("either 'requests' or 'seconds' must be provided")
+        return self
+
+
+class ProfiledFunction(BaseModel):
+    """One row of the top-N cumulative function table."""
+    function: str = Field(..., description="module:function:line label")
+    calls: Optional[int] = Field(None, description="Call count (deterministic mode only)")
+    self_seconds: float = Field(..., description="Time spent in the function itself")
+    cumulative_seconds: float = Field(..., description="Time spent in the function and its callees")
+
+
+class ProfilingReport(BaseModel):
+    """Status and aggregated results of the current profiling session."""
+    active: bool = Field(..., description="Whether new requests are still being profiled")
+    mode: Optional[str] = Field(None, description="Profiling mode of the session")
+    requests_profiled: int = Field(0, description="Number of requests captured so far")
+    max_requests: Optional[int] = Field(None, description="Request budget of the session")
+    seconds: Optional[float] = Field(None, description="Time budget of the session")
+    started_at: Optional[str] = Field(None, description="Session start (ISO 8601 format)")
+    top: List[ProfiledFunction] = Field(default_factory=list, description="Top functions by cumulative time")
+    collapsed: str = Field("", description="Collapsed stacks, one `stack count` per line")
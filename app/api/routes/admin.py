@@ -0,0 +1,98 @@
+"""Admin-only API routes.
+
+Exposes on-demand profiling of the prediction routes. All endpoints require
+the `X-Admin-Token` header to match `ADMIN_TOKEN`. When no token is
+configured `app.main` does not mount this router, so the endpoints are absent
+from both routing and the OpenAPI schema.
+"""
+import logging
+import secrets
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.api.models.profiling import (
+    ProfiledFunction,
+    ProfilingReport,
+    ProfilingStartRequest,
+)
+from app.services.profiling_service import get_profiling_service
+from app.config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Reject requests without a valid admin token."""
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    # Compare bytes: compare_digest raises TypeError on non-ASCII str
+    if x_admin_token is None or not secrets.compare_digest(
+            x_admin_token.encode(), settings.admin_token.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+def build_report(top: int) -> ProfilingReport:
+    """Build a report from the current (or last) profiling session."""
+    service = get_profiling_service()
+    session = service.session
+    if session is None:
+        return ProfilingReport(active=False)
+    return ProfilingReport(
+        active=service.active and not session.expired,
+        mode=session.mode,
+        requests_profiled=session.requests_profiled,
+        max_requests=session.max_requests,
+        seconds=session.duration_s,
+        started_at=datetime.fromtimestamp(session.started_at, timezone.utc).isoformat(),
+        top=[
+            ProfiledFunction(
+                function=row["function"],
+                calls=row["calls"],
+                self_seconds=row["self"],
+                cumulative_seconds=row["cumulative"],
+            )
+            for row in session.top_cumulative(top)
+        ],
+        collapsed=session.collapsed(),
+    )
+
+
+@router.post("/admin/profiling", response_model=ProfilingReport)
+def start_profiling(request: ProfilingStartRequest) -> ProfilingReport:
+    """Arm profiling for the next N prediction requests or T seconds."""
+    get_profiling_service().start(
+        mode=request.mode,
+        max_requests=request.requests,
+        duration_s=request.seconds,
+        interval_ms=request.interval_ms,
+    )
+    return build_report(top=0)
+
+
+@router.get("/admin/profiling", response_model=ProfilingReport)
+def get_profiling(top: int = Query(25, ge=0, le=500)) -> ProfilingReport:
+    """Return session status, top-N cumulative functions and collapsed stacks."""
+    return build_report(top=top)
+
+
+@router.get("/admin/profiling/collapsed", response_class=PlainTextResponse)
+def get_collapsed() -> PlainTextResponse:
+    """Return collapsed stacks as plain text, ready for flamegraph tools."""
+    session = get_profiling_service().session
+    text = session.collapsed() if session is not None else ""
+    return PlainTextResponse(text + "\n" if text else "")
+
+
+@router.delete("/admin/profiling", response_model=ProfilingReport)
+def stop_profiling(top: int = Query(25, ge=0, le=500)) -> ProfilingReport:
+    """Disarm profiling early and return the results collected so far."""
+    get_profiling_service().stop()
+    logger.info("Profiling stopped by admin request")
+    return build_report(top=top)
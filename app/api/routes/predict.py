@@ -1,7 +1,8 @@
 """Prediction API routes.
 
 Exposes endpoints for full and minimal payload predictions. Uses the
-`ModelService` to perform data enrichment and inference.
+`ModelService` to perform data enrichment and inference. Handlers run under
+`ProfilingService.capture()`, which is a no-op unless an admin armed it.
 """
 import json
 import logging
@@ -17,6 +18,7 @@ from app.api.models.prediction import (
     PredictionResponse,
 )
 from app.services.model_service import get_model_service
+from app.services.profiling_service import get_profiling_service
 from app.config.settings import get_settings
 
 logger = logging.getLogger(__name__)
@@ -64,56 +66,58 @@ def save_predictions_to_file(input_records: List[Dict[float, Any]], predictions:
 def predict(items: List[FullHouseFeatures]) -> List[PredictionResponse]:
     """Predict prices for a batch of full feature records.
     """
-    try:
-        service = get_model_service()
-        records: List[Dict[float, Any]] = [i.model_dump() for i in items]
-        logger.info("Received %d records for /predict", len(records))
-        preds = service.predict(records)
+    with get_profiling_service().capture():
+        try:
+            service = get_model_service()
+            records: List[Dict[float, Any]] = [i.model_dump() for i in items]
+            logger.info("Received %d records for /predict", len(records))
+            preds = service.predict(records)
         
-        # Save predictions to file
-        save_predictions_to_file(records, preds, "full")
+            # Save predictions to file
+            save_predictions_to_file(records, preds, "full")
         
-        model_name = settings.model_name
-        now_iso = datetime.now(timezone.utc).isoformat()
-        return [
-            PredictionResponse(
-                prediction=p,
-                model=model_name,
-                status="success",
-                message="Predicted Value in USD",
-                datetime=now_iso,
-            )
-            for p in preds
-        ]
-    except Exception as exc: 
-        logger.exception("Prediction failed: %s", exc)
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
+            model_name = settings.model_name
+            now_iso = datetime.now(timezone.utc).isoformat()
+            return [
+                PredictionResponse(
+                    prediction=p,
+                    model=model_name,
+                    status="success",
+                    message="Predicted Value in USD",
+                    datetime=now_iso,
+                )
+                for p in preds
+            ]
+        except Exception as exc: 
+            logger.exception("Prediction failed: %s", exc)
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
 
 
 @router.post("/predict/minimal", response_model=List[PredictionResponse])
 def predict_minimal(items: List[MinimalHouseFeatures]) -> List[PredictionResponse]:
     """Predict prices for a batch of minimal feature records."""
-    try:
-        service = get_model_service()
-        records: List[Dict[float, Any]] = [i.model_dump() for i in items]
-        logger.info("Received %d records for /predict/minimal", len(records))
-        preds = service.predict(records)
+    with get_profiling_service().capture():
+        try:
+            service = get_model_service()
+            records: List[Dict[float, Any]] = [i.model_dump() for i in items]
+            logger.info("Received %d records for /predict/minimal", len(records))
+            preds = service.predict(records)
         
-        # Save predictions to file
-        save_predictions_to_file(records, preds, "minimal")
+            # Save predictions to file
+            save_predictions_to_file(records, preds, "minimal")
         
-        model_name = settings.model_name
-        now_iso = datetime.now(timezone.utc).isoformat()
-        return [
-            PredictionResponse(
-                prediction=p,
-                model=model_name,
-                status="success",
-                message="Predicted Value in USD",
-                datetime=now_iso,
-            )
-            for p in preds
-        ]
-    except Exception as exc: 
-        logger.exception("Prediction (minimal) failed: %s", exc)
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
\ No newline at end of file
+            model_name = settings.model_name
+            now_iso = datetime.now(timezone.utc).isoformat()
+            return [
+                PredictionResponse(
+                    prediction=p,
+                    model=model_name,
+                    status="success",
+                    message="Predicted Value in USD",
+                    datetime=now_iso,
+                )
+                for p in preds
+            ]
+        except Exception as exc: 
+            logger.exception("Prediction (minimal) failed: %s", exc)
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
\ No newline at end of file
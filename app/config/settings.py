@@ -13,6 +13,8 @@ class Settings(BaseSettings):
     demographics_csv: str = os.getenv("DEMOGRAPHICS_CSV", "app/data/zipcode_demographics.csv")
     log_level: str = os.getenv("LOG_LEVEL", "INFO")
     model_name: str = os.getenv("MODEL_NAME", "KNeighborsRegressor")
+    # Admin endpoints are disabled unless a token is configured
+    admin_token: str = os.getenv("ADMIN_TOKEN", "")
 
     # API configs
     api_version: str = "1.0.0"
@@ -6,6 +6,7 @@ import logging
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 
+from app.api.routes.admin import router as admin_router
 from app.api.routes.predict import router as predict_router
 from app.config.settings import get_settings
 
@@ -33,4 +34,12 @@ app.include_router(
     tags=["inference"],
 )
 
+# Admin endpoints only exist when a token is configured
+if settings.admin_token:
+    app.include_router(
+        admin_router,
+        prefix=settings.api_major_version,
+        tags=["admin"],
+    )
+
 
@@ -0,0 +1,181 @@
+"""Numpy-only inference for the exported KNN pipeline.
+
+Reproduces `RobustScaler -> KNeighborsRegressor` from plain arrays written by
+`app/utils/export_model.py`, so the serving path needs neither sklearn nor
+pandas. Only brute-force Euclidean (minkowski, p=2) neighbors are supported.
+Equidistant neighbors are chosen deterministically by lower training index.
+"""
+import hashlib
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+
+# Query rows scored together; neighbors in norm order share a candidate band
+CHUNK_SIZE = 16
+# Training rows nearest in norm scored first to bound each row's k-th distance
+PROBE_SIZE = 1024
+
+
+def file_sha256(path: str) -> str:
+    """Return the hex SHA-256 digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ArrayKNNRegressor:
+    """Scaled k-nearest-neighbors regressor backed by numpy arrays."""
+    def __init__(self, center: np.ndarray, scale: np.ndarray, fit_x: np.ndarray,
+                 fit_y: np.ndarray, n_neighbors: int, weights: str = "uniform",
+                 source_sha256: str = "") -> None:
+        """Store scaler statistics and the (already scaled) training set.
+
+        `source_sha256` is the digest of the `model.pkl` this was exported
+        from, used to detect a stale export.
+        """
+        if weights not in ("uniform", "distance"):
+            raise ValueError(f"Unsupported weights: {weights}")
+        self._center = np.asarray(center, dtype=np.float64)
+        self._scale = np.asarray(scale, dtype=np.float64)
+        self._fit_x = np.asarray(fit_x, dtype=np.float64)
+        self._fit_y = np.asarray(fit_y, dtype=np.float64)
+        # Training rows sorted by norm: by the triangle inequality a row's
+        # neighbors within distance r have norms within r of its own norm
+        sq_norms = np.einsum("ij,ij->i", self._fit_x, self._fit_x)
+        self._norm_order = np.argsort(sq_norms, kind="stable")
+        self._sorted_x = self._fit_x[self._norm_order]
+        self._sorted_neg2_t = np.ascontiguousarray(-2.0 * self._sorted_x.T)
+        self._sorted_sq_norms = sq_norms[self._norm_order]
+        self._sorted_norms = np.sqrt(self._sorted_sq_norms)
+        self._max_fit_sq_norm = float(sq_norms.max(initial=0.0))
+        self._n_neighbors = int(n_neighbors)
+        self._weights = weights
+        self.source_sha256 = source_sha256
+
+    @classmethod
+    def load(cls, path: str) -> "ArrayKNNRegressor":
+        """Load an exported `model.npz` file."""
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                center=data["center"],
+                scale=data["scale"],
+                fit_x=data["fit_x"],
+                fit_y=data["fit_y"],
+                n_neighbors=int(data["n_neighbors"]),
+                weights=str(data["weights"]),
+                source_sha256=str(data["source_sha256"]) if "source_sha256" in data else "",
+            )
+
+    def save(self, path: str) -> None:
+        """Write the arrays to an uncompressed `.npz` file."""
+        np.savez(
+            path,
+            center=self._center,
+            scale=self._scale,
+            fit_x=self._fit_x,
+            fit_y=self._fit_y,
+            n_neighbors=np.int64(self._n_neighbors),
+            weights=np.str_(self._weights),
+            source_sha256=np.str_(self.source_sha256),
+        )
+
+    def describe(self) -> Dict[str, Any]:
+        """Return basic metadata about the exported model."""
+        return {
+            "n_neighbors": self._n_neighbors,
+            "weights": self._weights,
+            "n_samples": int(self._fit_x.shape[0]),
+            "n_features": int(self._fit_x.shape[1]),
+        }
+
+    def kneighbors(self, x: np.ndarray,
+                   n_neighbors: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (distances, indices) of the nearest training rows, closest first.
+
+        Rows are sorted by norm and processed in chunks of `CHUNK_SIZE`, so
+        memory stays bounded regardless of batch size. Equidistant neighbors
+        are ordered by lower training index.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        if x.ndim != 2 or x.shape[1] != self._fit_x.shape[1]:
+            raise ValueError(
+                f"Expected input with {self._fit_x.shape[1]} features, got shape {x.shape}")
+        if not np.isfinite(x).all():
+            raise ValueError("Input contains NaN or infinite values")
+        k = self._n_neighbors if n_neighbors is None else n_neighbors
+        if not 0 < k <= len(self._fit_x):
+            raise ValueError(f"Expected 0 < n_neighbors <= {len(self._fit_x)}, got {k}")
+
+        scaled = (x - self._center) / self._scale
+        row_sq_norms = np.einsum("ij,ij->i", scaled, scaled)
+        sq_dist = np.empty((len(scaled), k), dtype=np.float64)
+        indices = np.empty((len(scaled), k), dtype=np.int64)
+        row_order = np.argsort(row_sq_norms, kind="stable")
+        for start in range(0, len(scaled), CHUNK_SIZE):
+            rows = row_order[start:start + CHUNK_SIZE]
+            sq_dist[rows], indices[rows] = self._kneighbors_chunk(
+                scaled[rows], row_sq_norms[rows], k)
+        return np.sqrt(sq_dist), indices
+
+    def _kneighbors_chunk(self, scaled: np.ndarray, row_sq_norms: np.ndarray,
+                          k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (squared distances, indices) of the k nearest rows for one chunk.
+
+        Distances are first estimated with the GEMM expansion
+        ||a||^2 - 2ab + ||b||^2 against the `PROBE_SIZE` training rows closest
+        in norm. Each row's k-th estimate plus `tol`, a bound on the
+        expansion's cancellation error that grows with the operands' squared
+        norms, caps its true k-th distance. Only training rows inside the
+        resulting norm band are estimated, and every one under the cap is
+        re-scored exactly, so the result (including ties, ordered by training
+        index) never depends on GEMM rounding.
+        """
+        n_samples = len(self._sorted_x)
+        row_norms = np.sqrt(row_sq_norms)
+        tol = (2.0 * scaled.shape[1] * np.finfo(np.float64).eps
+               * (row_sq_norms + self._max_fit_sq_norm))
+
+        positions = np.searchsorted(self._sorted_norms, row_norms)
+        lo = max(0, min(int(positions.min()) - PROBE_SIZE // 2, n_samples - PROBE_SIZE))
+        hi = min(n_samples, max(int(positions.max()) + PROBE_SIZE // 2, lo + PROBE_SIZE))
+        cap = np.partition(self._estimate(scaled, lo, hi), k - 1, axis=1)[:, k - 1] + tol
+        # Slack covers rounding in the norms themselves
+        radius = np.sqrt(np.maximum(cap + row_sq_norms, 0.0)) * (1.0 + 1e-9) + 1e-9
+        lo = int(np.searchsorted(self._sorted_norms, (row_norms - radius).min(), "left"))
+        hi = int(np.searchsorted(self._sorted_norms, (row_norms + radius).max(), "right"))
+
+        rows, cols = np.nonzero(self._estimate(scaled, lo, hi) <= cap[:, None])
+        cols += lo
+        diff = self._sorted_x[cols] - scaled[rows]
+        exact = np.einsum("ij,ij->i", diff, diff)
+        candidates = self._norm_order[cols]
+        # Candidates grouped by row, then by (exact distance, training index)
+        order = np.lexsort((candidates, exact, rows))
+        counts = np.bincount(rows, minlength=len(scaled))
+        starts = np.cumsum(counts) - counts
+        pick = order[starts[:, None] + np.arange(k)]
+        return exact[pick], candidates[pick]
+
+    def _estimate(self, scaled: np.ndarray, lo: int, hi: int) -> np.ndarray:
+        """Return GEMM squared distances to sorted rows [lo, hi), minus ||a||^2."""
+        partial = scaled @ self._sorted_neg2_t[:, lo:hi]
+        partial += self._sorted_sq_norms[lo:hi]
+        return partial
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        """Predict targets for a 2D array of unscaled features."""
+        dist, indices = self.kneighbors(x)
+        neighbor_y = self._fit_y[indices]
+        if self._weights == "uniform":
+            return neighbor_y.mean(axis=1)
+
+        with np.errstate(divide="ignore"):
+            inv = 1.0 / dist
+        # Exact matches take all the weight, as in sklearn
+        exact = np.isinf(inv)
+        rows = exact.any(axis=1)
+        inv[rows] = exact[rows].astype(np.float64)
+        return (neighbor_y * inv).sum(axis=1) / inv.sum(axis=1)
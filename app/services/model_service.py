@@ -2,51 +2,118 @@
 
 Responsible for loading the trained model and demographics data,
 augmenting inputs, aligning features, and generating predictions.
+
+When `model.npz` (see `app/utils/export_model.py`) is present the service
+runs on numpy only. Otherwise, or when `model.pkl` is also present but is not
+the pickle the arrays were exported from, it unpickles `model.pkl`, which
+lazily imports pandas and sklearn on first use.
 """
+import csv
 import json
 import logging
+import os
 import pickle
-from typing import List, Dict, Any, Optional
-import pandas as pd
+from typing import TYPE_CHECKING, List, Dict, Any, Optional
+
+import numpy as np
+
 from app.config.settings import get_settings
+from app.services.array_model import ArrayKNNRegressor, file_sha256
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 logger = logging.getLogger(__name__)
 
+
+def load_demographics(path: str) -> Dict[str, Dict[str, float]]:
+    """Read the demographics CSV into `{zipcode: {column: value}}`."""
+    demographics: Dict[str, Dict[str, float]] = {}
+    with open(path, "r", newline="") as f:
+        for row in csv.DictReader(f):
+            zipcode = row.pop("zipcode")
+            demographics[zipcode] = {
+                col: float(val) if val != "" else float("nan")
+                for col, val in row.items()
+            }
+    return demographics
+
+
 class ModelService:
     """Service encapsulating model and feature engineering pipeline."""
     def __init__(self) -> None:
         """Initialize service by loading model, feature order, and demographics."""
         settings = get_settings()
 
-        logger.info("Loading model from %s", settings.model_dir)
-        with open(f"{settings.model_dir}/model.pkl", "rb") as f:
-            self._model = pickle.load(f)
         with open(f"{settings.model_dir}/model_features.json", "r") as f:
             self._feature_order: List[str] = json.load(f)
 
+        arrays_path = f"{settings.model_dir}/model.npz"
+        pickle_path = f"{settings.model_dir}/model.pkl"
+        self._array_model: Optional[ArrayKNNRegressor] = None
+        self._model: Any = None
+        if os.path.exists(arrays_path):
+            logger.info("Loading exported model arrays from %s", arrays_path)
+            self._array_model = ArrayKNNRegressor.load(arrays_path)
+            if (os.path.exists(pickle_path)
+                    and self._array_model.source_sha256 != file_sha256(pickle_path)):
+                logger.warning("%s was not exported from %s (stale export?); "
+                               "ignoring it and serving the pickle. "
+                               "Re-run app.utils.export_model.", arrays_path, pickle_path)
+                self._array_model = None
+        if self._array_model is None:
+            logger.info("Loading model from %s", settings.model_dir)
+            with open(pickle_path, "rb") as f:
+                self._model = pickle.load(f)
+
         logger.info("Loading demographics from %s",
                    settings.demographics_csv)
         # loads demographics dataset on init
-        self._demographics: pd.DataFrame = pd.read_csv(
-            settings.demographics_csv, 
-            dtype={"zipcode": str}
-        )
+        self._demographics: Dict[str, Dict[str, float]] = load_demographics(
+            settings.demographics_csv)
+
+    def _to_feature_matrix(self, records: List[Dict[float, Any]]) -> np.ndarray:
+        """Build a feature matrix in model order, enriching with demographics.
 
-    def _augment_with_demographics(self, df: pd.DataFrame) -> pd.DataFrame:
+        Features missing from both the record and demographics are filled
+        with zeros; zipcodes without demographics yield NaN, which the model
+        rejects, matching the left join of the pandas path.
+        """
+        matrix = np.zeros((len(records), len(self._feature_order)), dtype=np.float64)
+        for i, record in enumerate(records):
+            if "zipcode" not in record:
+                raise ValueError("zipcode is required for demographics join")
+            demographics = self._demographics.get(str(record["zipcode"]))
+            for j, col in enumerate(self._feature_order):
+                if col in record:
+                    matrix[i, j] = float(record[col])
+                elif demographics is None:
+                    matrix[i, j] = np.nan
+                elif col in demographics:
+                    matrix[i, j] = demographics[col]
+        return matrix
+
+    def _augment_with_demographics(self, df: "pd.DataFrame") -> "pd.DataFrame":
         """Join incoming rows with demographics on `zipcode`. Requires zipcode."""
+        import pandas as pd
+
         if "zipcode" not in df.columns:
             raise ValueError("zipcode is required for demographics join")
         df = df.copy()
-        merged = df.merge(self._demographics, how="left", on="zipcode")
+        demographics = pd.DataFrame.from_dict(self._demographics, orient="index")
+        demographics = demographics.rename_axis("zipcode").reset_index()
+        merged = df.merge(demographics, how="left", on="zipcode")
         # Drop zipcode if not used by the model
         if ("zipcode" not in self._feature_order
                 and "zipcode" in merged.columns):
             merged = merged.drop(columns=["zipcode"])
         return merged
 
-    def _to_feature_frame(self, records: List[Dict[float, Any]]) -> pd.DataFrame:
+    def _to_feature_frame(self, records: List[Dict[float, Any]]) -> "pd.DataFrame":
         """Convert list of dicts to a DataFrame aligned to model feature order."""
+        import pandas as pd
+
         raw_df = pd.DataFrame.from_records(records)
         augmented = self._augment_with_demographics(raw_df)
 
@@ -64,8 +131,11 @@ class ModelService:
 
         Returns list of floats to be JSON serializable.
         """
-        features = self._to_feature_frame(records)
-        preds = self._model.predict(features)
+        if self._array_model is not None:
+            preds = self._array_model.predict(self._to_feature_matrix(records))
+        else:
+            features = self._to_feature_frame(records)
+            preds = self._model.predict(features)
         return [float(x) for x in preds]
 
 
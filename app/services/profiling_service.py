@@ -0,0 +1,292 @@
+"""On-demand request profiling service.
+
+Captures stacks for a bounded number of prediction requests (or a time
+window) and aggregates them into collapsed-stack text for flamegraph tools
+plus a top-N cumulative function table. Collapsed stacks always come from a
+sampler thread; `deterministic` mode additionally runs cProfile on the
+request thread so the top-N table has exact call counts. Profiling is off by
+default: when no session is armed, `capture()` is a single attribute check
+and a bare yield.
+"""
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+SAMPLING = "sampling"
+DETERMINISTIC = "deterministic"
+PROFILING_MODES = (SAMPLING, DETERMINISTIC)
+
+
+def _frame_label(frame: Any) -> str:
+    """Return a `module:function:line` label for a stack frame."""
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", code.co_filename)
+    return f"{module}:{code.co_name}:{code.co_firstlineno}"
+
+
+def _module_names_by_file() -> Dict[str, str]:
+    """Map loaded modules' source files to their module names."""
+    names: Dict[str, str] = {}
+    for name, module in list(sys.modules.items()):
+        filename = getattr(module, "__file__", None)
+        if filename:
+            names[os.path.abspath(filename)] = name
+    return names
+
+
+def _stats_label(filename: str, line: int, name: str,
+                 modules: Dict[str, str]) -> str:
+    """Return the `module:function:line` label for a cProfile stats key."""
+    if filename == "~":
+        # Built-in functions have no source file
+        return f"builtins:{name}:{line}"
+    module = modules.get(os.path.abspath(filename))
+    if module is None:
+        module = os.path.relpath(filename) if os.path.isabs(filename) else filename
+    return f"{module}:{name}:{line}"
+
+
+class _StackSampler:
+    """Background thread sampling the stack of a single target thread."""
+    def __init__(self, thread_id: int, interval_s: float) -> None:
+        self._thread_id = thread_id
+        self._interval_s = interval_s
+        self._stop = threading.Event()
+        self.stacks: Counter = Counter()
+        self._thread = threading.Thread(target=self._run,
+                                        name="profiling-sampler",
+                                        daemon=True)
+
+    def _run(self) -> None:
+        """Walk the target thread's frame every interval until stopped."""
+        while not self._stop.wait(self._interval_s):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            labels: List[str] = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            # collapsed format is root-first, semicolon separated
+            self.stacks[";".join(reversed(labels))] += 1
+
+    def __enter__(self) -> "_StackSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+class ProfilingSession:
+    """Aggregated profiling state for one armed profiling window."""
+    def __init__(self, mode: str, max_requests: Optional[int],
+                 duration_s: Optional[float], interval_ms: float) -> None:
+        """Validate limits and initialize empty aggregates."""
+        if mode not in PROFILING_MODES:
+            raise ValueError(f"mode must be one of {PROFILING_MODES}")
+        if max_requests is None and duration_s is None:
+            raise ValueError("either max_requests or duration_s is required")
+        if interval_ms <= 0:
+            raise ValueError("interval_ms must be positive")
+        self.mode = mode
+        self.max_requests = max_requests
+        self.duration_s = duration_s
+        self.interval_ms = interval_ms
+        self.started_at = time.time()
+        self.requests_profiled = 0
+        self.in_flight = 0
+        self.stacks: Counter = Counter()
+        self._stats: Optional[pstats.Stats] = None
+
+    @property
+    def expired(self) -> bool:
+        """Whether the request or time budget of this session is spent."""
+        if (self.max_requests is not None
+                and self.requests_profiled + self.in_flight >= self.max_requests):
+            return True
+        if (self.duration_s is not None
+                and time.time() - self.started_at >= self.duration_s):
+            return True
+        return False
+
+    def add_stats(self, profile: cProfile.Profile) -> None:
+        """Merge deterministic profiler stats into the session aggregate."""
+        if self._stats is None:
+            self._stats = pstats.Stats(profile, stream=io.StringIO())
+        else:
+            self._stats.add(profile)
+
+    def collapsed(self) -> str:
+        """Return collapsed-stack text (`frame;frame;frame count` per line)."""
+        return "\n".join(f"{stack} {count}"
+                         for stack, count in sorted(self.stacks.items()))
+
+    def top_cumulative(self, limit: int) -> List[Dict[str, Any]]:
+        """Return the top `limit` functions by cumulative cost."""
+        if self._stats is not None:
+            modules = _module_names_by_file()
+            rows = []
+            for (filename, line, name), stat in self._stats.stats.items():
+                _cc, ncalls, tottime, cumtime, _callers = stat
+                rows.append({
+                    "function": _stats_label(filename, line, name, modules),
+                    "calls": ncalls,
+                    "self": tottime,
+                    "cumulative": cumtime,
+                })
+            rows.sort(key=lambda r: r["cumulative"], reverse=True)
+            return rows[:limit]
+
+        # Sampling: a function's cumulative cost is the number of samples in
+        # which it appears anywhere on the stack (counted once per sample).
+        cumulative: Counter = Counter()
+        self_samples: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            for label in set(frames):
+                cumulative[label] += count
+            self_samples[frames[-1]] += count
+        return [
+            {
+                "function": label,
+                "calls": None,
+                "self": self_samples[label] * self.interval_ms / 1000.0,
+                "cumulative": samples * self.interval_ms / 1000.0,
+            }
+            for label, samples in cumulative.most_common(limit)
+        ]
+
+
+class ProfilingService:
+    """Arms, captures and reports on-demand profiling sessions."""
+    def __init__(self) -> None:
+        """Start disarmed; no profiling happens until `start` is called."""
+        self._lock = threading.Lock()
+        self._session: Optional[ProfilingSession] = None
+        self._armed = False
+
+    def start(self, mode: str = SAMPLING, max_requests: Optional[int] = None,
+              duration_s: Optional[float] = None,
+              interval_ms: float = 5.0) -> ProfilingSession:
+        """Arm a new session, discarding any previous results."""
+        session = ProfilingSession(mode, max_requests, duration_s, interval_ms)
+        with self._lock:
+            self._session = session
+            self._armed = True
+        logger.info("Profiling armed: mode=%s max_requests=%s duration_s=%s",
+                    mode, max_requests, duration_s)
+        return session
+
+    def stop(self) -> Optional[ProfilingSession]:
+        """Disarm profiling and return the last session, if any."""
+        with self._lock:
+            self._armed = False
+            return self._session
+
+    @property
+    def session(self) -> Optional[ProfilingSession]:
+        """Return the current (or last finished) session."""
+        return self._session
+
+    @property
+    def active(self) -> bool:
+        """Whether new requests will be profiled."""
+        return self._armed
+
+    def _acquire(self) -> Optional[ProfilingSession]:
+        """Reserve a slot in the armed session, disarming it once spent."""
+        with self._lock:
+            session = self._session
+            if not self._armed or session is None:
+                return None
+            if session.expired:
+                self._armed = False
+                return None
+            session.in_flight += 1
+            return session
+
+    def _release(self, session: ProfilingSession,
+                 stacks: Optional[Counter],
+                 profile: Optional[cProfile.Profile]) -> None:
+        """Merge one request's results into its session."""
+        with self._lock:
+            session.in_flight -= 1
+            session.requests_profiled += 1
+            if stacks:
+                session.stacks.update(stacks)
+            if profile is not None:
+                session.add_stats(profile)
+            if session is self._session and session.expired:
+                self._armed = False
+                logger.info("Profiling session finished after %d requests",
+                            session.requests_profiled)
+
+    @staticmethod
+    def _enable_profile() -> Optional[cProfile.Profile]:
+        """Start cProfile on this thread, or return None if it cannot run.
+
+        Only one cProfile can be active at a time on Python 3.12+, so a
+        concurrent request falls back to sampling-only instead of failing.
+        """
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as exc:
+            logger.warning("cProfile unavailable, sampling this request only: %s", exc)
+            return None
+        return profile
+
+    @contextmanager
+    def capture(self) -> Iterator[None]:
+        """Profile the enclosed block if a session is armed.
+
+        Must run on the thread doing the work (sync FastAPI endpoints run in
+        a threadpool, so this wraps the handler body rather than middleware).
+        """
+        if not self._armed:
+            yield
+            return
+        session = self._acquire()
+        if session is None:
+            yield
+            return
+
+        profile: Optional[cProfile.Profile] = None
+        sampler = _StackSampler(threading.get_ident(),
+                                session.interval_ms / 1000.0)
+        try:
+            with sampler:
+                if session.mode == DETERMINISTIC:
+                    profile = self._enable_profile()
+                try:
+                    yield
+                finally:
+                    if profile is not None:
+                        profile.disable()
+        finally:
+            self._release(session, sampler.stacks, profile)
+
+
+# Singleton accessor
+_singleton: Optional["ProfilingService"] = None
+
+
+def get_profiling_service() -> ProfilingService:
+    """Return a singleton instance of `ProfilingService`."""
+    global _singleton
+    if _singleton is None:
+        _singleton = ProfilingService()
+    return _singleton
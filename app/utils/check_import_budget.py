@@ -0,0 +1,92 @@
+"""Import-time and startup-time budget check for the serving image.
+
+Imports `app.main` in a fresh interpreter under `python -X importtime`, sums
+the reported import time and fails if it exceeds the budget or if any heavy
+training-only module (pandas, sklearn, scipy) is pulled into the serving
+import graph. A second fresh interpreter measures time to a ready
+`ModelService`. Exits non-zero on any violation, so it can gate image builds.
+Run from the repository root with `python -m app.utils.check_import_budget`.
+"""
+import argparse
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+
+FORBIDDEN_MODULES: Tuple[str, ...] = ("pandas", "sklearn", "scipy")
+
+STARTUP_SNIPPET = (
+    "import time; t = time.perf_counter(); "
+    "import app.main; "
+    "from app.services.model_service import get_model_service; "
+    "get_model_service(); "
+    "print(time.perf_counter() - t)"
+)
+
+
+def measure_imports(module: str) -> Dict[str, int]:
+    """Return `{module: self import time in us}` for a fresh import of `module`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    timings: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        # Format: "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, _cumulative, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = int(self_us)
+    return timings
+
+
+def measure_startup() -> float:
+    """Return seconds from interpreter start of imports to a loaded model."""
+    result = subprocess.run(
+        [sys.executable, "-c", STARTUP_SNIPPET],
+        capture_output=True, text=True, check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main(import_budget_ms: float, startup_budget_ms: float, top: int) -> int:
+    """Check budgets and print a report. Returns the process exit code."""
+    failures: List[str] = []
+
+    timings = measure_imports("app.main")
+    total_ms = sum(timings.values()) / 1000.0
+    print(f"Import time for app.main: {total_ms:.1f}ms "
+          f"(budget {import_budget_ms:.0f}ms, {len(timings)} modules)")
+    for name, self_us in sorted(timings.items(), key=lambda kv: kv[1], reverse=True)[:top]:
+        print(f"  {self_us / 1000.0:8.1f}ms  {name}")
+    if total_ms > import_budget_ms:
+        failures.append(f"import time {total_ms:.1f}ms exceeds {import_budget_ms:.0f}ms")
+
+    heavy = sorted(name for name in timings
+                   if name.split(".")[0] in FORBIDDEN_MODULES)
+    if heavy:
+        roots = sorted({name.split(".")[0] for name in heavy})
+        failures.append(f"serving imports training-only modules: {', '.join(roots)}")
+
+    startup_ms = measure_startup() * 1000.0
+    print(f"Startup time to ready ModelService: {startup_ms:.1f}ms "
+          f"(budget {startup_budget_ms:.0f}ms)")
+    if startup_ms > startup_budget_ms:
+        failures.append(f"startup time {startup_ms:.1f}ms exceeds {startup_budget_ms:.0f}ms")
+
+    if failures:
+        print("\nBudget check FAILED:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print("\nBudget check passed")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--import-budget-ms", type=float, default=1500.0)
+    parser.add_argument("--startup-budget-ms", type=float, default=3000.0)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+    sys.exit(main(args.import_budget_ms, args.startup_budget_ms, args.top))
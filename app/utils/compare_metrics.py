@@ -2,11 +2,17 @@
 
 Reads development metrics from metrics.json and compares with production metrics
 calculated from model_predictions.json (when price_gt is available).
+Significance is decided on the prod-dev delta using both uncertainties: the
+development standard error of the repeated k-fold mean from `evaluate_cv.py`
+(metrics_cv.json) and a bootstrap standard error of the production sample.
+A delta is significant when its normal-approximation CI excludes zero.
+Without metrics_cv.json no verdict is given.
 """
 import argparse
 import json
 import numpy as np
 from pathlib import Path
+from statistics import NormalDist
 from sklearn import metrics
 
 
@@ -16,8 +22,74 @@ def load_metrics(path: Path) -> dict:
         return json.load(f)
 
 
+def load_dev_intervals(cv_file: str, scheme: str = "kfold") -> dict:
+    """Load per-metric mean, SE and CI of the development metrics, if present."""
+    cv_path = Path(cv_file)
+    if not cv_path.exists():
+        print(f"Warning: CV metrics file not found: {cv_file} "
+              "(run evaluate_cv.py; significance not assessed)")
+        return {}
+    cv_metrics = load_metrics(cv_path)
+    if scheme not in cv_metrics:
+        print(f"Warning: scheme '{scheme}' not found in {cv_file}")
+        return {}
+    intervals = {
+        metric: cv_metrics[scheme][metric]
+        for metric in ['mse', 'rmse', 'r2']
+        if metric in cv_metrics[scheme]
+    }
+    for data in intervals.values():
+        data["confidence"] = cv_metrics.get("coverage")
+    return intervals
+
+
+def bootstrap_intervals(y_true: np.ndarray, y_pred: np.ndarray,
+                        n_bootstrap: int = 2000, confidence: float = 0.95,
+                        random_state: int = 42) -> dict:
+    """Percentile bootstrap CIs and standard errors for MSE, RMSE and R2.
+
+    A metric maps to None when fewer than two finite replicates exist, e.g.
+    a single record, or constant ground truth for R2.
+    """
+    if len(y_true) < 2:
+        return {"mse": None, "rmse": None, "r2": None}
+    rng = np.random.default_rng(random_state)
+    idx = rng.integers(0, len(y_true), size=(n_bootstrap, len(y_true)))
+    yt, yp = y_true[idx], y_pred[idx]
+    sse = ((yt - yp) ** 2).sum(axis=1)
+    sst = ((yt - yt.mean(axis=1, keepdims=True)) ** 2).sum(axis=1)
+    mse = sse / len(y_true)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r2 = 1.0 - sse / sst
+    samples = {"mse": mse, "rmse": np.sqrt(mse), "r2": r2[np.isfinite(r2)]}
+
+    alpha = (1.0 - confidence) / 2.0
+    return {
+        metric: {
+            "se": float(values.std(ddof=1)),
+            "ci_low": float(np.quantile(values, alpha)),
+            "ci_high": float(np.quantile(values, 1.0 - alpha)),
+            "confidence": confidence,
+        } if len(values) >= 2 else None
+        for metric, values in samples.items()
+    }
+
+
+def delta_interval(delta: float, dev_se: float, prod_se: float,
+                   confidence: float = 0.95) -> dict:
+    """Normal-approximation CI of a prod-dev delta with independent errors."""
+    se = (dev_se ** 2 + prod_se ** 2) ** 0.5
+    half = NormalDist().inv_cdf(0.5 + confidence / 2.0) * se
+    return {
+        "se": se,
+        "ci_low": delta - half,
+        "ci_high": delta + half,
+        "confidence": confidence,
+    }
+
+
 def calculate_production_metrics(predictions_file: str) -> dict:
-    """Calculate production metrics from predictions with ground truth."""
+    """Calculate production metrics (with bootstrap CIs) from predictions with ground truth."""
     predictions_path = Path(predictions_file)
     if not predictions_path.exists():
         print(f"Warning: Predictions file not found: {predictions_file}")
@@ -34,8 +106,8 @@ def calculate_production_metrics(predictions_file: str) -> dict:
         return {}
     
     # Extract predictions and ground truth
-    y_pred = [float(p['price_prediction']) for p in valid_records]
-    y_true = [float(p['price_gt']) for p in valid_records]
+    y_pred = np.array([float(p['price_prediction']) for p in valid_records])
+    y_true = np.array([float(p['price_gt']) for p in valid_records])
     
     # Calculate metrics (same as in create_model.py)
     mse = metrics.mean_squared_error(y_true, y_pred)
@@ -46,11 +118,13 @@ def calculate_production_metrics(predictions_file: str) -> dict:
         "mse": mse,
         "rmse": rmse, 
         "r2": r2,
-        "sample_size": len(valid_records)
+        "sample_size": len(valid_records),
+        "intervals": bootstrap_intervals(y_true, y_pred)
     }
 
 
-def main(dev_file: str, predictions_file: str) -> None:
+def main(dev_file: str, predictions_file: str,
+         cv_file: str = "app/model/metrics_cv.json") -> None:
     """Compare development vs production metrics."""
     
     # Load development metrics
@@ -67,6 +141,9 @@ def main(dev_file: str, predictions_file: str) -> None:
     print(f"\nProduction metrics from: {predictions_file}")
     print(f"  {json.dumps(prod_metrics, indent=2)}")
     
+    prod_intervals = prod_metrics["intervals"]
+    dev_intervals = load_dev_intervals(cv_file)
+
     # Compare metrics
     print("\n" + "="*50)
     print("METRICS COMPARISON")
@@ -75,16 +152,32 @@ def main(dev_file: str, predictions_file: str) -> None:
     comparison = {}
     for metric in ['mse', 'rmse', 'r2']:
         if metric in dev_metrics and metric in prod_metrics:
-            dev_val = float(dev_metrics[metric])
+            dev_ci = dev_intervals.get(metric)
+            prod_ci = prod_intervals.get(metric)
+            # Prefer the resampled mean: it is the estimate the dev CI belongs to
+            if dev_ci is not None:
+                dev_val = float(dev_ci["mean"])
+            else:
+                dev_val = float(dev_metrics[metric])
             prod_val = float(prod_metrics[metric])
             delta = prod_val - dev_val
             rel_delta = (delta / dev_val) * 100 if dev_val != 0 else None
+
+            delta_ci = None
+            if (dev_ci is not None and dev_ci.get("se") is not None
+                    and prod_ci is not None):
+                delta_ci = delta_interval(delta, dev_ci["se"], prod_ci["se"])
             
             comparison[metric] = {
                 "development": dev_val,
                 "production": prod_val,
                 "delta": delta,
-                "relative_delta_pct": rel_delta
+                "relative_delta_pct": rel_delta,
+                "dev_ci": dev_ci,
+                "prod_ci": prod_ci,
+                "delta_ci": delta_ci,
+                "significant": (None if delta_ci is None else
+                                not (delta_ci["ci_low"] <= 0.0 <= delta_ci["ci_high"]))
             }
     
     # Print comparison
@@ -95,15 +188,31 @@ def main(dev_file: str, predictions_file: str) -> None:
         print(f"  Delta:       {data['delta']:+.6f}")
         if data['relative_delta_pct'] is not None:
             print(f"  Change:      {data['relative_delta_pct']:+.2f}%")
+        for label, key in [("Dev k-fold mean", "dev_ci"),
+                           ("Prod bootstrap", "prod_ci"),
+                           ("Delta", "delta_ci")]:
+            ci = data[key]
+            if ci is not None and ci.get("ci_low") is not None:
+                level = f"{ci['confidence']:.0%} " if ci.get('confidence') else ""
+                print(f"  {label} {level}CI: [{ci['ci_low']:.6f}, {ci['ci_high']:.6f}]")
+        if data['significant'] is None:
+            verdict = "not assessed (missing development or production uncertainty)"
+        elif data['significant']:
+            verdict = "SIGNIFICANT (delta CI excludes zero)"
+        else:
+            verdict = "not significant (delta CI includes zero)"
+        print(f"  Verdict:     {verdict}")
     
     # Summary
     print(f"\nSummary:")
-    print(f"  Development sample: Test split from training data")
+    if dev_intervals:
+        print(f"  Development sample: Repeated k-fold mean from {cv_file}")
+    else:
+        print(f"  Development sample: Test split from training data")
     print(f"  Production sample:  {prod_metrics['sample_size']} predictions with ground truth")
+    print(f"  Significance:       CI of prod-dev delta from both standard errors")
 
 
 if __name__ == "__main__":
     
     main(dev_file="app/model/metrics.json",predictions_file="app/model/model_predictions.json")
-
-
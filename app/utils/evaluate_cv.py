@@ -0,0 +1,207 @@
+"""Resampled evaluation harness for the trained model.
+
+Runs repeated k-fold and bootstrap (out-of-bag) evaluation of the persisted
+model's pipeline across a process pool. For MSE/RMSE/R2 it reports the mean
+with a standard error and confidence interval, plus the percentile range of
+the per-fold scores and per-fold fit/predict wall time and rows/sec. For
+repeated k-fold the CI is the corrected resampled-t interval (Nadeau &
+Bengio), which inflates the variance for overlapping training sets; for the
+bootstrap scheme it is the percentile interval of the out-of-bag replicate
+scores. `compare_metrics.py` combines these with the production sample's
+uncertainty to test the prod-dev delta. The enriched dataset is loaded once
+in the parent process and handed to each worker through the pool
+initializer, so no fold re-reads the CSVs. Each worker is limited to one native thread so the
+timings measure throughput rather than CPU oversubscription. Run from the
+repository root with `python -m app.utils.evaluate_cv`.
+"""
+import argparse
+import json
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import stats
+from sklearn import base, metrics, model_selection
+from threadpoolctl import threadpool_limits
+
+from app.utils.evaluate_model import MODEL_DIR, load_data
+
+
+METRIC_NAMES: Tuple[str, ...] = ("mse", "rmse", "r2")
+THREADS_PER_WORKER = 1
+
+# Worker-side cache populated once per process by `_init_worker`
+_X: Optional[np.ndarray] = None
+_Y: Optional[np.ndarray] = None
+_MODEL: Any = None
+_THREAD_LIMITS: Any = None
+
+
+def load_dataset() -> Tuple[np.ndarray, np.ndarray]:
+    """Load the enriched dataset aligned to the model feature order."""
+    x, y = load_data()
+    with open(MODEL_DIR / "model_features.json", "r") as f:
+        feature_order = json.load(f)
+    for col in feature_order:
+        if col not in x.columns:
+            x[col] = 0
+    x = x[feature_order]
+    return x.to_numpy(dtype=np.float64), y.to_numpy(dtype=np.float64)
+
+
+def _init_worker(x: np.ndarray, y: np.ndarray, model: Any) -> None:
+    """Cache the dataset and model template, and pin native thread pools."""
+    global _X, _Y, _MODEL, _THREAD_LIMITS
+    # Env covers libraries loaded later; threadpoolctl the ones already loaded
+    os.environ["OMP_NUM_THREADS"] = str(THREADS_PER_WORKER)
+    _THREAD_LIMITS = threadpool_limits(limits=THREADS_PER_WORKER)
+    _X, _Y, _MODEL = x, y, model
+
+
+def _run_split(task: Tuple[str, int, np.ndarray, np.ndarray]) -> Dict[str, Any]:
+    """Fit a fresh clone of the model on one split and score it."""
+    scheme, index, train_idx, test_idx = task
+    model = base.clone(_MODEL)
+
+    start = time.perf_counter()
+    model.fit(_X[train_idx], _Y[train_idx])
+    fit_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    preds = model.predict(_X[test_idx])
+    predict_s = time.perf_counter() - start
+
+    y_test = _Y[test_idx]
+    mse = metrics.mean_squared_error(y_test, preds)
+    return {
+        "scheme": scheme,
+        "index": index,
+        "mse": mse,
+        "rmse": mse ** 0.5,
+        "r2": metrics.r2_score(y_test, preds),
+        "train_rows": int(len(train_idx)),
+        "test_rows": int(len(test_idx)),
+        "fit_seconds": fit_s,
+        "predict_seconds": predict_s,
+        "fit_rows_per_sec": len(train_idx) / fit_s if fit_s > 0 else None,
+        "predict_rows_per_sec": len(test_idx) / predict_s if predict_s > 0 else None,
+    }
+
+
+def build_tasks(n_rows: int, n_splits: int, n_repeats: int, n_bootstrap: int,
+                random_state: int) -> List[Tuple[str, int, np.ndarray, np.ndarray]]:
+    """Build repeated k-fold and out-of-bag bootstrap index splits."""
+    tasks = []
+    rkf = model_selection.RepeatedKFold(n_splits=n_splits, n_repeats=n_repeats,
+                                        random_state=random_state)
+    for i, (train_idx, test_idx) in enumerate(rkf.split(np.arange(n_rows))):
+        tasks.append(("kfold", i, train_idx, test_idx))
+
+    rng = np.random.default_rng(random_state)
+    all_idx = np.arange(n_rows)
+    for i in range(n_bootstrap):
+        train_idx = rng.integers(0, n_rows, size=n_rows)
+        test_idx = np.setdiff1d(all_idx, train_idx, assume_unique=False)
+        tasks.append(("bootstrap", i, train_idx, test_idx))
+    return tasks
+
+
+def summarize(values: List[float], scheme: str, test_train_ratio: float,
+              coverage: float) -> Dict[str, Optional[float]]:
+    """Return mean, std, the percentile range, and a CI of the mean.
+
+    `kfold` uses the corrected resampled-t interval, whose variance factor
+    `1/J + n_test/n_train` accounts for correlation between folds that share
+    training rows. `bootstrap` uses the percentile interval of the replicates.
+    The CI fields are None when fewer than two fits are available.
+    """
+    arr = np.asarray(values, dtype=np.float64)
+    alpha = (1.0 - coverage) / 2.0
+    out: Dict[str, Optional[float]] = {
+        "mean": float(arr.mean()),
+        "std": float(arr.std(ddof=1)) if len(arr) > 1 else 0.0,
+        "range_low": float(np.quantile(arr, alpha)),
+        "range_high": float(np.quantile(arr, 1.0 - alpha)),
+        "se": None,
+        "ci_low": None,
+        "ci_high": None,
+    }
+    if len(arr) < 2:
+        return out
+    if scheme == "kfold":
+        se = float(np.sqrt((1.0 / len(arr) + test_train_ratio) * arr.var(ddof=1)))
+        half = float(stats.t.ppf(1.0 - alpha, len(arr) - 1)) * se
+        out.update(se=se, ci_low=out["mean"] - half, ci_high=out["mean"] + half)
+    else:
+        out.update(se=out["std"], ci_low=out["range_low"], ci_high=out["range_high"])
+    return out
+
+
+def main(n_splits: int = 5, n_repeats: int = 3, n_bootstrap: int = 30,
+         coverage: float = 0.95, workers: Optional[int] = None,
+         random_state: int = 42) -> None:
+    """Run resampled evaluation and write `metrics_cv.json`."""
+    x, y = load_dataset()
+    with open(MODEL_DIR / "model.pkl", "rb") as f:
+        model = pickle.load(f)
+
+    tasks = build_tasks(len(y), n_splits, n_repeats, n_bootstrap, random_state)
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(x, y, model)) as pool:
+        folds = list(pool.map(_run_split, tasks))
+
+    out: Dict[str, Any] = {
+        "coverage": coverage,
+        "workers": workers,
+        "threads_per_worker": THREADS_PER_WORKER,
+        "n_rows": int(len(y)),
+        "n_splits": n_splits,
+        "n_repeats": n_repeats,
+        "n_bootstrap": n_bootstrap,
+        "random_state": random_state,
+    }
+    for scheme in ("kfold", "bootstrap"):
+        scheme_folds = [f for f in folds if f["scheme"] == scheme]
+        if not scheme_folds:
+            continue
+        test_train_ratio = (float(np.mean([f["test_rows"] for f in scheme_folds]))
+                            / float(np.mean([f["train_rows"] for f in scheme_folds])))
+        out[scheme] = {
+            name: summarize([f[name] for f in scheme_folds], scheme,
+                            test_train_ratio, coverage)
+            for name in METRIC_NAMES + ("fit_seconds", "predict_seconds")
+        }
+        out[scheme]["folds"] = scheme_folds
+
+    # Write resampled metrics next to the model artifacts
+    with open(MODEL_DIR / "metrics_cv.json", "w") as f:
+        json.dump(out, f, indent=2)
+
+    print(f"{workers} workers x {THREADS_PER_WORKER} thread(s)")
+    for scheme in ("kfold", "bootstrap"):
+        if scheme not in out:
+            continue
+        print(f"{scheme} ({len(out[scheme]['folds'])} fits, mean, {coverage:.0%} CI of mean, "
+              f"{coverage:.0%} range of fold scores):")
+        for name in METRIC_NAMES + ("fit_seconds", "predict_seconds"):
+            s = out[scheme][name]
+            ci = (f"[{s['ci_low']:.6g}, {s['ci_high']:.6g}]"
+                  if s['ci_low'] is not None else "[n/a]")
+            print(f"  {name:<16} {s['mean']:.6g} CI {ci} "
+                  f"range [{s['range_low']:.6g}, {s['range_high']:.6g}]")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--splits", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--bootstrap", type=int, default=30)
+    parser.add_argument("--coverage", type=float, default=0.95)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    main(n_splits=args.splits, n_repeats=args.repeats, n_bootstrap=args.bootstrap,
+         coverage=args.coverage, workers=args.workers)
@@ -0,0 +1,112 @@
+"""Export the pickled sklearn pipeline to plain numpy arrays.
+
+Writes `model.npz` next to `model.pkl` so the API can serve predictions with
+numpy only (see `app/services/array_model.py`). The pickle's SHA-256 is stored
+in the export so a stale `model.npz` is detected after a retrain. Verifies the exported model
+reproduces the pickled pipeline on rows it never trained on (the held-out
+split and `future_unseen_examples.csv`) before writing.
+Run from the repository root with `python -m app.utils.export_model`.
+"""
+import json
+import pickle
+
+import numpy as np
+import pandas as pd
+from sklearn import model_selection, neighbors, pipeline, preprocessing
+
+from app.services.array_model import ArrayKNNRegressor, file_sha256
+from app.utils.evaluate_model import DATA_DIR, MODEL_DIR, load_data
+
+
+def to_array_model(model: pipeline.Pipeline, source_sha256: str = "") -> ArrayKNNRegressor:
+    """Convert a `RobustScaler -> KNeighborsRegressor` pipeline to arrays."""
+    steps = [step for _, step in model.steps]
+    if (len(steps) != 2
+            or not isinstance(steps[0], preprocessing.RobustScaler)
+            or not isinstance(steps[1], neighbors.KNeighborsRegressor)):
+        raise ValueError(f"Unsupported pipeline for export: {model}")
+    scaler, knn = steps
+    if knn.effective_metric_ != "euclidean":
+        raise ValueError(f"Unsupported KNN metric for export: {knn.effective_metric_}")
+    if callable(knn.weights):
+        raise ValueError("Callable KNN weights cannot be exported")
+
+    n_features = knn._fit_X.shape[1]
+    center = scaler.center_ if scaler.center_ is not None else np.zeros(n_features)
+    scale = scaler.scale_ if scaler.scale_ is not None else np.ones(n_features)
+    return ArrayKNNRegressor(
+        center=center,
+        scale=scale,
+        fit_x=knn._fit_X,
+        fit_y=knn._y,
+        n_neighbors=knn.n_neighbors,
+        weights=knn.weights,
+        source_sha256=source_sha256,
+    )
+
+
+def load_unseen_rows(feature_order: list) -> pd.DataFrame:
+    """Return held-out and future unseen rows aligned to the model features."""
+    x, y = load_data()
+    _x_train, x_test, _y_train, _y_test = model_selection.train_test_split(
+        x, y, random_state=42)
+
+    demographics = pd.read_csv(DATA_DIR / "zipcode_demographics.csv", dtype={"zipcode": str})
+    future = pd.read_csv(DATA_DIR / "future_unseen_examples.csv", dtype={"zipcode": str})
+    future = future.merge(demographics, how="left", on="zipcode")
+
+    rows = pd.concat([x_test, future], ignore_index=True)
+    for col in feature_order:
+        if col not in rows.columns:
+            rows[col] = 0
+    return rows[feature_order]
+
+
+def check_parity(model: pipeline.Pipeline, array_model: ArrayKNNRegressor,
+                 rows: pd.DataFrame) -> int:
+    """Raise unless the exported model reproduces the pickle on `rows`.
+
+    Neighbor distances must match on every row. Predictions must match on
+    every row except where the k-th and (k+1)-th neighbors are exactly
+    equidistant: there sklearn's pick depends on BLAS rounding, while the
+    array model takes the lower training index. Returns the number of such
+    tied rows that differ.
+    """
+    scaler, knn = model.steps[0][1], model.steps[-1][1]
+    expected_dist, _ = knn.kneighbors(scaler.transform(rows))
+    dist, _ = array_model.kneighbors(rows.to_numpy(dtype=np.float64),
+                                     n_neighbors=knn.n_neighbors + 1)
+    # sklearn's ||a||^2 - 2ab + ||b||^2 expansion carries ~1e-8 absolute
+    # cancellation error in squared distance (e.g. 2.4e-4 instead of 0 for
+    # identical rows), so compare squared distances
+    if not np.allclose(expected_dist ** 2, dist[:, :-1] ** 2, rtol=1e-6, atol=1e-6):
+        raise ValueError("Exported model neighbor distances diverge from pickle")
+
+    mismatched = ~np.isclose(array_model.predict(rows.to_numpy(dtype=np.float64)),
+                             model.predict(rows), rtol=1e-6)
+    tied = np.isclose(dist[:, -2], dist[:, -1], rtol=1e-12, atol=0.0)
+    if (mismatched & ~tied).any():
+        raise ValueError(
+            f"Exported model diverges from pickle on {(mismatched & ~tied).sum()}/{len(rows)} rows")
+    return int(mismatched.sum())
+
+
+def main() -> None:
+    """Export `model.pkl` to `model.npz` after checking prediction parity."""
+    with open(MODEL_DIR / "model.pkl", "rb") as f:
+        model = pickle.load(f)
+    with open(MODEL_DIR / "model_features.json", "r") as f:
+        feature_order = json.load(f)
+    array_model = to_array_model(model, source_sha256=file_sha256(str(MODEL_DIR / "model.pkl")))
+
+    rows = load_unseen_rows(feature_order)
+    tie_rows = check_parity(model, array_model, rows)
+
+    array_model.save(str(MODEL_DIR / "model.npz"))
+    print(f"Exported {array_model.describe()} to {MODEL_DIR / 'model.npz'}")
+    print(f"Parity checked on {len(rows)} unseen rows; "
+          f"{tie_rows} differ only by an exact tie at the k-th neighbor")
+
+
+if __name__ == "__main__":
+    main()
@@ -30,6 +30,9 @@ python3 "$UTILS_DIR/generate_ground_truth.py"
 echo "Running evaluate_model.py..."
 python3 "$UTILS_DIR/evaluate_model.py"
 
+echo "Running evaluate_cv.py..."
+python3 -m app.utils.evaluate_cv
+
 echo "Running compare_metrics.py..."
 python3 "$UTILS_DIR/compare_metrics.py"
 